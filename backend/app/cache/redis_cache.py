@@ -1,6 +1,6 @@
 import json
 import redis.asyncio as redis
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Iterable, List, Optional, Tuple, Union
 import os
 from dotenv import load_dotenv
 
@@ -60,4 +60,75 @@ class RedisCache:
             return True
         except Exception as e:
             print(f"Redis clear error: {str(e)}")
-            return False 
\ No newline at end of file
+            return False 
+
+    async def dump(
+        self,
+        match: str = "*",
+        batch_size: int = 500
+    ) -> AsyncIterator[Tuple[str, int, str]]:
+        """
+        Stream string cache entries as (key, ttl_seconds, raw_json) tuples.
+
+        Keys without an expiry are reported with a ttl of -1. Values and TTLs
+        are fetched in pipelined batches as keys come back from SCAN, so only
+        one batch is held in memory at a time. Unlike the single-key helpers,
+        Redis errors are raised rather than logged so callers never mistake a
+        partial dump for a complete one.
+        """
+        batch = []
+        async for key in self.redis.scan_iter(match=match, count=batch_size, _type="STRING"):
+            batch.append(key)
+            if len(batch) >= batch_size:
+                for entry in await self._fetch_entries(batch):
+                    yield entry
+                batch = []
+        if batch:
+            for entry in await self._fetch_entries(batch):
+                yield entry
+
+    async def _fetch_entries(self, keys: List[str]) -> List[Tuple[str, int, str]]:
+        """Fetch values and TTLs for a batch of keys in one pipeline."""
+        pipe = self.redis.pipeline(transaction=False)
+        for key in keys:
+            pipe.get(key)
+            pipe.ttl(key)
+        results = await pipe.execute()
+        entries = []
+        for i, key in enumerate(keys):
+            value, ttl = results[2 * i], results[2 * i + 1]
+            # Skip keys that expired between SCAN and GET
+            if value is None or ttl == -2:
+                continue
+            entries.append((key, ttl, value))
+        return entries
+
+    async def restore(
+        self,
+        entries: Iterable[Tuple[str, int, Union[str, bytes]]],
+        batch_size: int = 500,
+        overwrite: bool = False
+    ) -> int:
+        """
+        Bulk load (key, ttl_seconds, raw_json) tuples using pipelined SETs.
+
+        Values are written as-is without re-encoding. A ttl of -1 means the
+        key has no expiry; any other ttl below 1 second is already expired
+        and skipped. Unless overwrite is set, keys already present in Redis
+        are left untouched so fresher data from another worker is not
+        clobbered. Errors are raised; returns the number of keys written.
+        """
+        written = 0
+        pipe = self.redis.pipeline(transaction=False)
+        pending = 0
+        for key, ttl, value in entries:
+            if ttl != -1 and ttl <= 0:
+                continue
+            pipe.set(key, value, ex=None if ttl == -1 else ttl, nx=not overwrite)
+            pending += 1
+            if pending >= batch_size:
+                written += sum(1 for ok in await pipe.execute() if ok)
+                pending = 0
+        if pending:
+            written += sum(1 for ok in await pipe.execute() if ok)
+        return written
@@ -0,0 +1,263 @@
+"""
+Offline cache snapshots for warm-starting workers.
+
+A snapshot is a flat binary file that can be memory-mapped and walked in
+place:
+
+    header:  MAGIC (8 bytes) | version (uint16) | exported at (float64,
+             unix seconds) | entry count (uint32)
+    entry:   key length (uint32) | ttl (int32) | value length (uint32)
+             | key (utf-8) | value (raw JSON, utf-8)
+
+Values are stored exactly as they sit in Redis. On import the file is
+mapped and validated up front, then each value is copied out of the mapping
+as bytes while its pipeline batch is built, so it is never decoded and only
+the batch in flight is held in memory alongside the mapping.
+
+Usage:
+    python -m app.cache.snapshot export snapshot.bin
+    python -m app.cache.snapshot import snapshot.bin [--overwrite]
+"""
+
+import argparse
+import asyncio
+import mmap
+import os
+import struct
+import time
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from redis.exceptions import RedisError
+
+from .redis_cache import RedisCache
+
+MAGIC = b"MCCSNAP\x00"
+VERSION = 2
+
+_HEADER = struct.Struct("<8sHdI")
+_ENTRY = struct.Struct("<IiI")
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is missing, truncated or incompatible."""
+
+
+class _SnapshotWriter:
+    """
+    Stream entries into a temporary snapshot file.
+
+    On a clean exit the file is fsynced and renamed into place; on any error
+    the temporary file is removed, so neither a failed export nor a crash
+    can replace an existing snapshot with a partial one.
+    """
+
+    def __init__(self, path: str, exported_at: Optional[float] = None):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.exported_at = time.time() if exported_at is None else exported_at
+        self.count = 0
+        self._file = open(self.tmp_path, "wb")
+        # Entry count is patched in once all entries have been streamed
+        self._file.write(_HEADER.pack(MAGIC, VERSION, self.exported_at, 0))
+
+    def write(self, key: str, ttl: int, value: Union[str, bytes]) -> None:
+        key_bytes = key.encode("utf-8")
+        value_bytes = value.encode("utf-8") if isinstance(value, str) else value
+        self._file.write(_ENTRY.pack(len(key_bytes), ttl, len(value_bytes)))
+        self._file.write(key_bytes)
+        self._file.write(value_bytes)
+        self.count += 1
+
+    def _commit(self) -> None:
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(MAGIC, VERSION, self.exported_at, self.count))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def _discard(self) -> None:
+        self._file.close()
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+    def __enter__(self) -> "_SnapshotWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is not None:
+            self._discard()
+            return
+        try:
+            self._commit()
+        except BaseException:
+            self._discard()
+            raise
+
+
+def write_snapshot(
+    path: str,
+    entries: Iterable[Tuple[str, int, Union[str, bytes]]],
+    exported_at: Optional[float] = None
+) -> int:
+    """
+    Write (key, ttl_seconds, raw_json) entries to a snapshot file.
+    """
+    with _SnapshotWriter(path, exported_at) as writer:
+        for key, ttl, value in entries:
+            writer.write(key, ttl, value)
+    return writer.count
+
+
+class Snapshot:
+    """
+    A validated, memory-mapped snapshot file.
+
+    The whole file is checked when it is opened, so a missing, truncated or
+    incompatible snapshot raises SnapshotError before anything is written
+    to Redis. Only value offsets are indexed; values are copied out of the
+    mapping as they are iterated.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.exported_at = 0.0
+        self._index: List[Tuple[str, int, int, int]] = []
+        self._file = None
+        self._mmap = None
+        try:
+            self._open()
+        except BaseException:
+            self.close()
+            raise
+
+    def _open(self) -> None:
+        try:
+            self._file = open(self.path, "rb")
+        except OSError as e:
+            raise SnapshotError(f"Cannot open snapshot {self.path}: {e}") from e
+
+        size = os.fstat(self._file.fileno()).st_size
+        if size < _HEADER.size:
+            raise SnapshotError(f"Snapshot {self.path} is truncated")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, exported_at, count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise SnapshotError(f"{self.path} is not a cache snapshot")
+        if version != VERSION:
+            raise SnapshotError(
+                f"Unsupported snapshot version {version} (expected {VERSION})"
+            )
+        self.exported_at = exported_at
+
+        offset = _HEADER.size
+        for _ in range(count):
+            if offset + _ENTRY.size > size:
+                raise SnapshotError(f"Snapshot {self.path} is truncated")
+            key_len, ttl, value_len = _ENTRY.unpack_from(self._mmap, offset)
+            offset += _ENTRY.size
+            end = offset + key_len + value_len
+            if end > size:
+                raise SnapshotError(f"Snapshot {self.path} is truncated")
+            try:
+                key = self._mmap[offset:offset + key_len].decode("utf-8")
+            except UnicodeDecodeError as e:
+                raise SnapshotError(f"Snapshot {self.path} is corrupt: {e}") from e
+            self._index.append((key, ttl, offset + key_len, end))
+            offset = end
+        if offset != size:
+            raise SnapshotError(f"Snapshot {self.path} has trailing data")
+
+    def fresh_entries(self, now: Optional[float] = None) -> Iterator[Tuple[str, int, bytes]]:
+        """
+        Yield entries with their TTLs reduced by the snapshot's age.
+
+        Entries that have expired since the export are dropped; entries
+        without an expiry (ttl of -1) are yielded unchanged.
+        """
+        if now is None:
+            now = time.time()
+        age = max(0.0, now - self.exported_at)
+        for key, ttl, start, end in self._index:
+            if ttl != -1:
+                ttl = int(ttl - age)
+                if ttl <= 0:
+                    continue
+            yield key, ttl, self._mmap[start:end]
+
+    def close(self) -> None:
+        """Release the mapping and the underlying file."""
+        self._index = []
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Something outside the snapshot still holds a view of the
+                # mapping; let garbage collection unmap it instead.
+                pass
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+async def export_cache(cache: RedisCache, path: str) -> int:
+    """
+    Dump the current cache contents to a snapshot file.
+
+    Redis errors propagate and leave any existing snapshot at path intact.
+    """
+    with _SnapshotWriter(path) as writer:
+        async for key, ttl, value in cache.dump():
+            writer.write(key, ttl, value)
+    return writer.count
+
+
+async def import_cache(cache: RedisCache, path: str, overwrite: bool = False) -> int:
+    """
+    Restore a snapshot file into the cache using pipelined writes.
+    """
+    with Snapshot(path) as snapshot:
+        return await cache.restore(snapshot.fresh_entries(), overwrite=overwrite)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export or import cache snapshots.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Dump Redis cache to a snapshot file")
+    export_parser.add_argument("path")
+
+    import_parser = subparsers.add_parser("import", help="Load a snapshot file into Redis")
+    import_parser.add_argument("path")
+    import_parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Replace keys that already exist in Redis"
+    )
+
+    args = parser.parse_args()
+    cache = RedisCache()
+
+    try:
+        if args.command == "export":
+            count = asyncio.run(export_cache(cache, args.path))
+            print(f"Exported {count} keys to {args.path}")
+        else:
+            count = asyncio.run(import_cache(cache, args.path, overwrite=args.overwrite))
+            print(f"Restored {count} keys from {args.path}")
+    except (SnapshotError, RedisError, OSError) as e:
+        parser.exit(1, f"Snapshot {args.command} failed: {e}\n")
+
+
+if __name__ == "__main__":
+    main()
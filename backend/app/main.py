@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
@@ -8,9 +9,33 @@ import os
 from app.models import ComputePricing
 from app.providers import aws, azure, gcp
 from app.cache.redis_cache import RedisCache
+from app.cache.snapshot import import_cache
 from app.auth import oauth_router
 
-app = FastAPI(title="Cloud Marketplace Cost Comparator")
+# Initialize Redis cache
+cache = RedisCache()
+
+async def warm_cache_from_snapshot():
+    """
+    Preload the cache from an offline snapshot so a fresh deployment or a
+    flushed Redis does not send the first wave of traffic to every provider.
+    """
+    snapshot_path = os.getenv("CACHE_SNAPSHOT_PATH")
+    if not snapshot_path:
+        return
+    try:
+        restored = await import_cache(cache, snapshot_path)
+        print(f"Restored {restored} cache keys from {snapshot_path}")
+    except Exception as e:
+        # A missing or bad snapshot should never stop the API from starting cold
+        print(f"Cache snapshot error: {str(e)}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await warm_cache_from_snapshot()
+    yield
+
+app = FastAPI(title="Cloud Marketplace Cost Comparator", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -28,9 +53,6 @@ app.add_middleware(
     max_age=3600  # 1 hour
 )
 
-# Initialize Redis cache
-cache = RedisCache()
-
 # Include auth routes
 app.include_router(oauth_router, prefix="/api/v1/auth", tags=["auth"])
 
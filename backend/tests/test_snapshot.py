@@ -0,0 +1,251 @@
+import asyncio
+import os
+import sys
+import time
+from fnmatch import fnmatchcase
+
+import pytest
+from fastapi.testclient import TestClient
+from redis.exceptions import ConnectionError, ResponseError
+
+import app.main
+from app.cache import snapshot
+from app.cache.redis_cache import RedisCache
+from app.cache.snapshot import (
+    MAGIC,
+    Snapshot,
+    SnapshotError,
+    _HEADER,
+    export_cache,
+    import_cache,
+    write_snapshot,
+)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def get(self, key):
+        self.commands.append(("get", key))
+
+    def ttl(self, key):
+        self.commands.append(("ttl", key))
+
+    def set(self, key, value, ex=None, nx=False):
+        self.commands.append(("set", key, value, ex, nx))
+
+    async def execute(self):
+        if self.redis.fail:
+            raise ConnectionError("Redis is down")
+        results = []
+        for command in self.commands:
+            if command[0] != "set" and command[1] in self.redis.others:
+                raise ResponseError("WRONGTYPE Operation against a key holding the wrong kind of value")
+            if command[0] == "get":
+                entry = self.redis.store.get(command[1])
+                results.append(entry[0] if entry else None)
+            elif command[0] == "ttl":
+                entry = self.redis.store.get(command[1])
+                results.append(entry[1] if entry else -2)
+            else:
+                _, key, value, ex, nx = command
+                if nx and key in self.redis.store:
+                    results.append(None)
+                    continue
+                if not isinstance(value, str):
+                    value = bytes(value).decode("utf-8")
+                self.redis.store[key] = (value, -1 if ex is None else ex)
+                results.append(True)
+        self.commands = []
+        return results
+
+
+class FakeRedis:
+    def __init__(self, store=None, others=None, fail=False):
+        self.store = dict(store or {})
+        # Non-string keys, mapped to their Redis type name
+        self.others = dict(others or {})
+        self.fail = fail
+
+    async def scan_iter(self, match=None, count=None, _type=None):
+        if self.fail:
+            raise ConnectionError("Redis is down")
+        keys = [(key, "string") for key in self.store]
+        keys += list(self.others.items())
+        for key, key_type in keys:
+            if match is not None and not fnmatchcase(key, match):
+                continue
+            if _type is not None and key_type != _type.lower():
+                continue
+            yield key
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+def make_cache(store=None, others=None, fail=False):
+    cache = RedisCache()
+    cache.redis = FakeRedis(store, others=others, fail=fail)
+    return cache
+
+
+async def collect(entries):
+    return [entry async for entry in entries]
+
+
+def test_export_import_round_trip(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    source = make_cache({
+        "regions": ('{"us-east-1": "N. Virginia"}', 86400),
+        "pinned": ("[]", -1),
+    })
+
+    assert asyncio.run(export_cache(source, path)) == 2
+
+    target = make_cache()
+    assert asyncio.run(import_cache(target, path)) == 2
+    value, ttl = target.redis.store["regions"]
+    assert value == '{"us-east-1": "N. Virginia"}'
+    assert 86390 <= ttl <= 86400
+    assert target.redis.store["pinned"] == ("[]", -1)
+
+
+def test_import_keeps_existing_keys_unless_overwrite(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    write_snapshot(path, [("regions", 3600, '"old"')])
+
+    cache = make_cache({"regions": ('"new"', 3600)})
+    assert asyncio.run(import_cache(cache, path)) == 0
+    assert cache.redis.store["regions"][0] == '"new"'
+
+    assert asyncio.run(import_cache(cache, path, overwrite=True)) == 1
+    assert cache.redis.store["regions"][0] == '"old"'
+
+
+def test_import_missing_file_raises(tmp_path):
+    cache = make_cache()
+    with pytest.raises(SnapshotError):
+        asyncio.run(import_cache(cache, str(tmp_path / "missing.bin")))
+    assert cache.redis.store == {}
+
+
+def test_import_truncated_file_writes_nothing(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    write_snapshot(path, [(f"key:{i}", 3600, '"value"') for i in range(1000)])
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 3)
+
+    cache = make_cache()
+    with pytest.raises(SnapshotError):
+        asyncio.run(import_cache(cache, path))
+    assert cache.redis.store == {}
+
+
+def test_import_rejects_other_versions(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, 1, time.time(), 0))
+
+    with pytest.raises(SnapshotError, match="version"):
+        Snapshot(path)
+
+
+def test_restore_skips_zero_ttl():
+    cache = make_cache()
+    written = asyncio.run(cache.restore([("a", 0, '"stale"'), ("b", -1, '"kept"')]))
+    assert written == 1
+    assert cache.redis.store == {"b": ('"kept"', -1)}
+
+
+def test_fresh_entries_subtract_snapshot_age(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    exported_at = time.time() - 100
+    write_snapshot(
+        path,
+        [("expired", 50, "1"), ("live", 3600, "2"), ("pinned", -1, "3")],
+        exported_at=exported_at,
+    )
+
+    with Snapshot(path) as snap:
+        entries = {
+            key: ttl for key, ttl, _ in snap.fresh_entries(now=exported_at + 100)
+        }
+    assert entries == {"live": 3500, "pinned": -1}
+
+
+def test_failed_export_keeps_previous_snapshot(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    write_snapshot(path, [("regions", 3600, '"good"')])
+    before = open(path, "rb").read()
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(export_cache(make_cache(fail=True), path))
+    assert open(path, "rb").read() == before
+    assert not os.path.exists(f"{path}.tmp")
+
+
+def test_failed_write_removes_temp_file(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+
+    def entries():
+        yield "regions", 3600, '"ok"'
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        write_snapshot(path, entries())
+    assert not os.path.exists(path)
+    assert not os.path.exists(f"{path}.tmp")
+
+
+def test_dump_skips_non_string_keys_and_streams_batches():
+    store = {f"compute:{i}": ("[]", 3600) for i in range(5)}
+    cache = make_cache(store, others={"sessions": "hash", "queue": "list"})
+
+    entries = asyncio.run(collect(cache.dump(batch_size=2)))
+    assert sorted(key for key, _, _ in entries) == sorted(store)
+
+    entries = asyncio.run(collect(cache.dump(match="compute:1")))
+    assert entries == [("compute:1", 3600, "[]")]
+
+
+def test_cli_exits_non_zero_on_snapshot_error(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "snapshot.bin"
+    path.write_bytes(b"not a snapshot at all, just junk")
+    monkeypatch.setattr(snapshot, "RedisCache", make_cache)
+    monkeypatch.setattr(sys, "argv", ["snapshot", "import", str(path)])
+
+    with pytest.raises(SystemExit) as exc_info:
+        snapshot.main()
+    assert exc_info.value.code == 1
+    assert "not a cache snapshot" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("setup", ["missing", "corrupt", "redis_down"])
+def test_startup_hook_logs_and_continues(tmp_path, monkeypatch, capsys, setup):
+    path = tmp_path / "snapshot.bin"
+    cache = make_cache()
+    if setup == "corrupt":
+        path.write_bytes(b"junk")
+    elif setup == "redis_down":
+        write_snapshot(str(path), [("regions", 3600, '"ok"')])
+        cache = make_cache(fail=True)
+    monkeypatch.setattr(app.main, "cache", cache)
+    monkeypatch.setenv("CACHE_SNAPSHOT_PATH", str(path))
+
+    with TestClient(app.main.app):
+        pass
+    assert "Cache snapshot error" in capsys.readouterr().out
+    assert cache.redis.store == {}
+
+
+def test_startup_hook_restores_snapshot(tmp_path, monkeypatch):
+    path = str(tmp_path / "snapshot.bin")
+    write_snapshot(path, [("regions", 3600, '"ok"')])
+    cache = make_cache()
+    monkeypatch.setattr(app.main, "cache", cache)
+    monkeypatch.setenv("CACHE_SNAPSHOT_PATH", path)
+
+    asyncio.run(app.main.warm_cache_from_snapshot())
+    assert cache.redis.store["regions"][0] == '"ok"'